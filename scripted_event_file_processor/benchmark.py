@@ -0,0 +1,122 @@
+import logging
+import os
+import random
+import string
+import tempfile
+import time
+from typing import List
+
+from main import *
+from layout_index import build_layout_index, load_layout_index, read_window
+from validation import validate_events
+
+# the converter logs at debug level by default which would dominate every measurement
+logging.getLogger().setLevel(logging.WARNING)
+
+def build_large_timeline(num_segments: int, events_per_segment: int, seed: int = 0) -> Timeline:
+    rng = random.Random(seed)
+    timeline = Timeline()
+    segment_duration = timeline.num_time_units_per_timeline_segment
+    # events sit on a half second grid and toggles last 1.7s, this keeps the closing tag of a toggle
+    # from being clobbered by the next event rendered on the same channel
+    num_slots = segment_duration * 2 - 4
+    for segment_index in range(num_segments):
+        segment_start = segment_index * segment_duration
+        for j, slot in enumerate(sorted(rng.sample(range(num_slots), min(events_per_segment, num_slots)))):
+            time = segment_start + slot * 0.5
+            # the layout parser only accepts letters in playthrough keys
+            if j % 3 == 0:
+                timeline.add_event(f"t{string.ascii_lowercase[j]}", f"toggle_{j}", time, Action.TOGGLE_ON)
+                timeline.add_event(f"t{string.ascii_lowercase[j]}", f"toggle_{j}", time + 1.7, Action.TOGGLE_OFF)
+            else:
+                timeline.add_event(f"p{string.ascii_lowercase[j]}", f"playthrough_{j}", time, Action.PLAYTHROUGH)
+        timeline.add_comment(f"segment {segment_index}", segment_start)
+    return timeline
+
+def benchmark_parallel_render(worker_counts: List[int] = [1, 2, 4, 8], num_segments: int = 2000, events_per_segment: int = 12):
+    timeline = build_large_timeline(num_segments, events_per_segment)
+    serial_output = None
+    print(f"rendering {num_segments} segments with {len(timeline.events)} events")
+    for num_workers in worker_counts:
+        start = time.perf_counter()
+        output = timeline.generate_timeline(num_workers)
+        elapsed = time.perf_counter() - start
+        if serial_output is None:
+            serial_output = output
+        assert output == serial_output, "parallel render differs from serial render"
+        print(f"workers: {num_workers:2d} | {elapsed:8.3f}s | {num_segments / elapsed:10.1f} segments/s")
+
+def benchmark_parallel_parse(worker_counts: List[int] = [1, 2, 4, 8], num_segments: int = 2000, events_per_segment: int = 12):
+    timeline = build_large_timeline(num_segments, events_per_segment)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "large_scripted_event.txt")
+        with open(file_path, "w") as file:
+            file.write(timeline.generate_script_event_file_contents())
+
+        with open(file_path, "r") as file:
+            legend = parse_legend_to_dictionary(extract_legend(file.read()))
+
+        serial_events = None
+        results = []
+        for num_workers in worker_counts:
+            start = time.perf_counter()
+            parsed_events = parse_event_layout(file_path, legend, num_workers)
+            elapsed = time.perf_counter() - start
+            if serial_events is None:
+                serial_events = parsed_events
+            assert parsed_events == serial_events, "parallel parse differs from serial parse"
+            results.append((num_workers, elapsed))
+
+    print(f"parsing {num_segments} layout blocks with {len(serial_events['events'])} events")
+    for num_workers, elapsed in results:
+        print(f"workers: {num_workers:2d} | {elapsed:8.3f}s | {num_segments / elapsed:10.1f} blocks/s")
+
+def benchmark_read_window(num_segments: int = 360, events_per_segment: int = 12, num_lookups: int = 1000, window_duration: float = 2):
+    # 360 segments of 10 seconds is an hour long scripted sequence
+    timeline = build_large_timeline(num_segments, events_per_segment)
+    rng = random.Random(0)
+    segment_duration = timeline.num_time_units_per_timeline_segment
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "large_scripted_event.txt")
+        with open(file_path, "w") as file:
+            file.write(timeline.generate_script_event_file_contents())
+
+        start = time.perf_counter()
+        build_layout_index(file_path)
+        build_elapsed = time.perf_counter() - start
+
+        # the first lookup builds the index and loads the legend
+        load_layout_index(file_path)
+        read_window(file_path, 0, window_duration)
+
+        window_starts = [rng.uniform(0, num_segments * segment_duration) for _ in range(num_lookups)]
+        start = time.perf_counter()
+        for t0 in window_starts:
+            read_window(file_path, t0, t0 + window_duration)
+        lookup_elapsed = time.perf_counter() - start
+
+    print(f"indexing {num_segments} layout blocks took {build_elapsed * 1000:.3f}ms")
+    print(f"read_window over {window_duration}s windows: {lookup_elapsed / num_lookups * 1000:.3f}ms per lookup")
+
+def benchmark_validate(num_events: int = 100_000, num_names: int = 200, seed: int = 0):
+    rng = random.Random(seed)
+    events = []
+    for i in range(num_events):
+        name = f"event_{rng.randrange(num_names)}"
+        location = {"key": name, "block": i // 20, "line": i % 20, "column": 15}
+        if i % 2 == 0:
+            start_tick = rng.randrange(0, num_events * 10)
+            events.append({"name": name, "start_tick": start_tick, "end_tick": start_tick + rng.randrange(0, 50), "type": "toggle", **location})
+        else:
+            events.append({"name": name, "tick": rng.randrange(0, num_events * 10), "type": "playthrough", **location})
+
+    start = time.perf_counter()
+    issues = validate_events(events)
+    elapsed = time.perf_counter() - start
+    print(f"validating {num_events} events found {len(issues)} issues in {elapsed * 1000:.3f}ms")
+
+if __name__ == "__main__":
+    benchmark_parallel_render()
+    benchmark_parallel_parse()
+    benchmark_read_window()
+    benchmark_validate()
@@ -0,0 +1,187 @@
+"""
+Exports the json produced by the converter to the Chrome Trace Event format, the result can be opened
+in chrome://tracing or https://ui.perfetto.dev to see how the scripted events line up in time.
+
+The replay harness drives the python model of ScriptedEvent::run at a fixed delta time and records
+the wall clock cost of every callback into the same trace, which makes frames where too many events
+fire at once easy to spot. Both processes of the trace share the scripted time axis: a replayed frame
+is placed at the scripted time it runs at and its duration is the wall clock time it took, callbacks
+are placed inside their frame at their wall clock offset from the start of the frame.
+
+Usage:
+    python chrome_trace.py smoking_event.json smoking_event.trace.json --replay --delta-time 0.016
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+from scripted_event_model import ScriptedEvent
+
+SCRIPTED_TIMELINE_PID = 1
+REPLAY_PID = 2
+FRAMES_TID = 0
+
+def seconds_to_microseconds(seconds: float) -> float:
+    # trace event timestamps and durations are in microseconds
+    return seconds * 1_000_000
+
+def get_event_name_to_track_id(events_json: Dict) -> Dict[str, int]:
+    """
+    Gives every event name its own track, track 0 is kept for the replay's frames.
+    """
+    event_names = sorted({event["name"] for event in events_json["events"]})
+    return {event_name: track_id for track_id, event_name in enumerate(event_names, start=1)}
+
+def generate_track_metadata(pid: int, process_name: str, event_name_to_track_id: Dict[str, int]) -> List[Dict]:
+    metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": process_name}}]
+    for event_name, track_id in event_name_to_track_id.items():
+        metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": track_id, "args": {"name": event_name}})
+        metadata.append({"name": "thread_sort_index", "ph": "M", "pid": pid, "tid": track_id, "args": {"sort_index": track_id}})
+    return metadata
+
+def convert_events_json_to_chrome_trace(events_json: Dict, pid: int = SCRIPTED_TIMELINE_PID) -> List[Dict]:
+    """
+    Converts the converter's json output into trace events, toggles become duration events and
+    playthroughs become instant events, each on the track of their event name.
+    """
+    event_name_to_track_id = get_event_name_to_track_id(events_json)
+    trace_events = generate_track_metadata(pid, "scripted timeline", event_name_to_track_id)
+
+    for event in events_json["events"]:
+        track_id = event_name_to_track_id[event["name"]]
+        if event["type"] == "toggle":
+            trace_events.append({
+                "name": event["name"],
+                "cat": "toggle",
+                "ph": "X",
+                "ts": seconds_to_microseconds(event["start_time"]),
+                "dur": seconds_to_microseconds(event["end_time"] - event["start_time"]),
+                "pid": pid,
+                "tid": track_id,
+                "args": {"start_time": event["start_time"], "end_time": event["end_time"]},
+            })
+        elif event["type"] == "playthrough":
+            trace_events.append({
+                "name": event["name"],
+                "cat": "playthrough",
+                "ph": "i",
+                "s": "t",
+                "ts": seconds_to_microseconds(event["time"]),
+                "pid": pid,
+                "tid": track_id,
+                "args": {"time": event["time"]},
+            })
+        else:
+            raise ValueError(f"Unknown event type: {event['type']}")
+
+    return trace_events
+
+def replay_scripted_event(events_json: Dict, delta_time: float,
+                          event_callbacks: Optional[Dict[str, Callable[[bool, bool], None]]] = None,
+                          duration: Optional[float] = None, pid: int = REPLAY_PID) -> List[Dict]:
+    """
+    Runs the model of ScriptedEvent::run every delta_time seconds until duration (by default just past
+    the last event) and returns trace events holding the wall clock cost of every frame and callback.
+
+    Callbacks that aren't given are replaced by ones that do nothing, so the trace then shows the
+    overhead of the run loop itself.
+    """
+    if delta_time <= 0:
+        raise ValueError(f"The replay's delta time must be positive, got {delta_time}")
+
+    event_name_to_track_id = get_event_name_to_track_id(events_json)
+    trace_events = generate_track_metadata(pid, "replay", event_name_to_track_id)
+    trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": FRAMES_TID, "args": {"name": "frames"}})
+
+    if duration is None:
+        event_times = [event.get("end_time", event.get("time")) for event in events_json["events"]]
+        duration = max(event_times, default=0) + delta_time
+
+    if event_callbacks is None:
+        event_callbacks = {}
+    event_callbacks = {event_name: event_callbacks.get(event_name, lambda first_call, last_call: None)
+                       for event_name in event_name_to_track_id}
+
+    frame_index = 0
+    frame_ts = 0.0
+    frame_start = 0.0
+    callback_calls_in_frame = []
+
+    def time_callback(event_name: str, callback: Callable[[bool, bool], None]) -> Callable[[bool, bool], None]:
+        def timed_callback(first_call: bool, last_call: bool):
+            callback_start = time.perf_counter()
+            callback(first_call, last_call)
+            callback_end = time.perf_counter()
+            callback_calls_in_frame.append(event_name)
+            trace_events.append({
+                "name": event_name,
+                "cat": "callback",
+                "ph": "X",
+                "ts": frame_ts + seconds_to_microseconds(callback_start - frame_start),
+                "dur": seconds_to_microseconds(callback_end - callback_start),
+                "pid": pid,
+                "tid": event_name_to_track_id[event_name],
+                "args": {"frame": frame_index, "first_call": first_call, "last_call": last_call},
+            })
+        return timed_callback
+
+    timed_event_callbacks = {event_name: time_callback(event_name, callback) for event_name, callback in event_callbacks.items()}
+
+    scripted_event = ScriptedEvent(events_json)
+    while scripted_event.current_time_seconds <= duration:
+        callback_calls_in_frame.clear()
+        # run advances the scripted time before processing events, so this is the time the frame runs at
+        frame_ts = seconds_to_microseconds(scripted_event.current_time_seconds + delta_time)
+        frame_start = time.perf_counter()
+        scripted_event.run(delta_time, timed_event_callbacks)
+        frame_end = time.perf_counter()
+
+        trace_events.append({
+            "name": f"frame {frame_index}",
+            "cat": "frame",
+            "ph": "X",
+            "ts": frame_ts,
+            "dur": seconds_to_microseconds(frame_end - frame_start),
+            "pid": pid,
+            "tid": FRAMES_TID,
+            "args": {"scripted_time": scripted_event.current_time_seconds, "callbacks": list(callback_calls_in_frame)},
+        })
+        trace_events.append({
+            "name": "callbacks per frame",
+            "ph": "C",
+            "ts": frame_ts,
+            "pid": pid,
+            "args": {"callbacks": len(callback_calls_in_frame)},
+        })
+        frame_index += 1
+
+    return trace_events
+
+def positive_float(value: str) -> float:
+    parsed_value = float(value)
+    if parsed_value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return parsed_value
+
+def write_chrome_trace(output_path: str, trace_events: List[Dict]):
+    with open(output_path, "w") as file:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export scripted event json to the Chrome Trace Event format.")
+    parser.add_argument("events_json_path", help="Json file produced by the scripted event converter")
+    parser.add_argument("output_path", help="Where to write the trace")
+    parser.add_argument("--replay", action="store_true", help="Also replay the events and record the cost of every callback")
+    parser.add_argument("--delta-time", type=positive_float, default=1 / 60, help="Seconds between replayed frames")
+    parsed_args = parser.parse_args()
+
+    with open(parsed_args.events_json_path, "r") as file:
+        events_json = json.load(file)
+
+    trace_events = convert_events_json_to_chrome_trace(events_json)
+    if parsed_args.replay:
+        trace_events.extend(replay_scripted_event(events_json, parsed_args.delta_time))
+
+    write_chrome_trace(parsed_args.output_path, trace_events)
+    print(f"Trace written to {parsed_args.output_path}.")
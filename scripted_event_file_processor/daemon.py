@@ -0,0 +1,180 @@
+"""
+Long running conversion daemon, it keeps the converter modules imported and the parsed scripted event
+files cached so that build scripts only pay for a socket round trip per conversion.
+
+Requests are newline terminated JSON objects of the form {"command": ..., "args": {...}} sent over a
+unix domain socket, every request gets a single JSON line back of the form {"ok": true, "result": ...}
+or {"ok": false, "error": ...}. See daemon_client.py for the matching client.
+
+Usage:
+    python daemon.py --socket /tmp/scripted_event_daemon.sock
+"""
+import argparse
+import os
+import socket
+import socketserver
+import stat
+import threading
+from typing import Dict, Tuple
+
+from main import *
+from text_utils.main import generate_unique_abbreviation
+from daemon_client import DEFAULT_SOCKET_PATH
+from validation import validate_events
+
+def add_json_event_to_timeline(timeline: Timeline, event: Dict):
+    """
+    Adds an event given either in the marker form {"name", "time", "action"} or in the form written by
+    the converter, where toggles have a start and end time and become a toggle on and toggle off pair.
+    """
+    if "action" in event:
+        timeline.add_event_automatic_uid(event["name"], event["time"], Action(event["action"]))
+    elif event.get("type") == "playthrough":
+        timeline.add_event_automatic_uid(event["name"], event["time"], Action.PLAYTHROUGH)
+    elif event.get("type") == "toggle":
+        # both halves of the toggle have to share a uid for the renderer to pair them
+        uid = generate_unique_abbreviation(timeline.get_current_event_uids(), event["name"])
+        timeline.add_event(uid, event["name"], event["start_time"], Action.TOGGLE_ON)
+        timeline.add_event(uid, event["name"], event["end_time"], Action.TOGGLE_OFF)
+    else:
+        raise ValueError(f"Events must either have an 'action' or a 'type' of playthrough or toggle, got: {event}")
+
+class ScriptedEventDaemon:
+    def __init__(self):
+        # maps a scripted event file path and whether it was parsed strictly to the (modification time, size)
+        # it was parsed at and its parsed events
+        self.parsed_file_cache: Dict[Tuple[str, bool], Tuple[Tuple[int, int], Dict]] = {}
+        self.cache_lock = threading.Lock()
+
+    def parse_scripted_event_file(self, scripted_event_file_path: str, strict: bool = True) -> Dict:
+        file_stat = os.stat(scripted_event_file_path)
+        file_version = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        with self.cache_lock:
+            cached = self.parsed_file_cache.get((scripted_event_file_path, strict))
+        if cached is not None and cached[0] == file_version:
+            logging.info(f"Using cached parse of {scripted_event_file_path}")
+            return cached[1]
+
+        with open(scripted_event_file_path, 'r') as file:
+            legend = parse_legend_to_dictionary(extract_legend(file.read()))
+        parsed_events = parse_event_layout(scripted_event_file_path, legend, strict=strict)
+
+        with self.cache_lock:
+            self.parsed_file_cache[(scripted_event_file_path, strict)] = (file_version, parsed_events)
+        return parsed_events
+
+    def convert(self, args: Dict) -> Dict:
+        parsed_events = self.parse_scripted_event_file(args["scripted_event_file_path"])
+        write_to_json(args["json_output_path"], convert_ticks_to_seconds(parsed_events))
+        return {"json_output_path": args["json_output_path"], "num_events": len(parsed_events["events"])}
+
+    def render(self, args: Dict) -> Dict:
+        # a fresh timeline per request since timelines are mutated while events are added
+        timeline = Timeline()
+        for comment in args.get("comments", []):
+            timeline.add_comment(comment["contents"], comment["time"])
+        for event in args["events"]:
+            add_json_event_to_timeline(timeline, event)
+
+        # forking from a multithreaded server can deadlock on locks held by other request threads,
+        # so the daemon only ever renders on a thread pool
+        contents = timeline.generate_script_event_file_contents(args.get("num_workers", 1), use_processes=False)
+
+        if "output_path" in args:
+            with open(args["output_path"], "w") as file:
+                file.write(contents)
+            return {"output_path": args["output_path"]}
+
+        return {"contents": contents}
+
+    def validate(self, args: Dict) -> Dict:
+        try:
+            parsed_events = self.parse_scripted_event_file(args["scripted_event_file_path"], strict=False)
+        except ValueError as e:
+            return {"valid": False, "errors": [str(e)], "issues": [], "num_events": 0}
+        issues = validate_events(parsed_events["events"])
+        return {"valid": not issues, "errors": [str(issue) for issue in issues],
+                "issues": [issue.to_dict() for issue in issues], "num_events": len(parsed_events["events"])}
+
+    def handle_request(self, request: Dict) -> Dict:
+        command_to_handler = {
+            "convert": self.convert,
+            "render": self.render,
+            "validate": self.validate,
+        }
+
+        command = request.get("command")
+        if command not in command_to_handler:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+
+        try:
+            return {"ok": True, "result": command_to_handler[command](request.get("args", {}))}
+        except Exception as e:
+            logging.exception(f"An error occurred while handling the {command} request.")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+class ScriptedEventRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # a client may send any number of requests over one connection
+        for request_line in self.rfile:
+            if not request_line.strip():
+                continue
+            try:
+                request = json.loads(request_line)
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Malformed request: {e}"}
+            else:
+                response = self.server.scripted_event_daemon.handle_request(request)
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+class ScriptedEventDaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, scripted_event_daemon: ScriptedEventDaemon):
+        self.scripted_event_daemon = scripted_event_daemon
+        super().__init__(socket_path, ScriptedEventRequestHandler)
+
+def remove_stale_socket(socket_path: str):
+    """
+    Removes a socket left behind by a daemon that didn't shut down cleanly, since it would make the bind
+    fail, but refuses to take over the socket of a daemon that is still running.
+    """
+    if not os.path.exists(socket_path):
+        return
+
+    # connecting to a regular file is refused too, so it has to be ruled out before anything is removed
+    if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            logging.info(f"Removing stale socket {socket_path}")
+            os.remove(socket_path)
+            return
+
+    raise RuntimeError(f"A scripted event daemon is already listening on {socket_path}")
+
+def serve(socket_path: str = DEFAULT_SOCKET_PATH):
+    remove_stale_socket(socket_path)
+
+    with ScriptedEventDaemonServer(socket_path, ScriptedEventDaemon()) as server:
+        logging.info(f"Scripted event daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Shutting down the scripted event daemon.")
+        finally:
+            os.remove(socket_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve scripted event conversions over a unix domain socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Path of the unix domain socket to listen on")
+    parser.add_argument("--log-level", default="INFO", help="Logging level of the daemon, the converter logs at DEBUG by default")
+    parsed_args = parser.parse_args()
+
+    logging.getLogger().setLevel(parsed_args.log_level.upper())
+    serve(parsed_args.socket)
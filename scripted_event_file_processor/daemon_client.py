@@ -0,0 +1,83 @@
+"""
+Thin client for the scripted event daemon, this only uses the standard library so that build scripts
+don't pay for importing the converter on every invocation.
+
+Usage:
+    python daemon_client.py convert smoking_event.txt smoking_event.json
+    python daemon_client.py validate smoking_event.txt
+    python daemon_client.py render events.json --output-path exported_event.txt
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Dict
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "scripted_event_daemon.sock")
+
+def send_request(command: str, args: Dict, socket_path: str = DEFAULT_SOCKET_PATH) -> Dict:
+    """
+    Sends a single request to the daemon and returns its response, requests and responses are
+    newline terminated JSON objects.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps({"command": command, "args": args}) + "\n").encode("utf-8"))
+        with client.makefile("r", encoding="utf-8") as response_file:
+            response_line = response_file.readline()
+
+    if not response_line:
+        raise ConnectionError("The daemon closed the connection without responding")
+
+    return json.loads(response_line)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Send a request to the scripted event daemon.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Path of the daemon's unix domain socket")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert a scripted event file to a json file")
+    convert_parser.add_argument("scripted_event_file_path")
+    convert_parser.add_argument("json_output_path")
+
+    validate_parser = subparsers.add_parser("validate", help="Check a scripted event file for unknown keys and conflicting events")
+    validate_parser.add_argument("scripted_event_file_path")
+
+    render_parser = subparsers.add_parser("render", help="Render a json event list into a scripted event file")
+    render_parser.add_argument("events_json_path")
+    render_parser.add_argument("--output-path", default=None)
+    render_parser.add_argument("--num-workers", type=int, default=1)
+
+    parsed_args = parser.parse_args()
+
+    if parsed_args.command == "convert":
+        args = {"scripted_event_file_path": os.path.abspath(parsed_args.scripted_event_file_path),
+                "json_output_path": os.path.abspath(parsed_args.json_output_path)}
+    elif parsed_args.command == "validate":
+        args = {"scripted_event_file_path": os.path.abspath(parsed_args.scripted_event_file_path)}
+    else:
+        with open(parsed_args.events_json_path, "r") as file:
+            events_json = json.load(file)
+        args = {"events": events_json["events"], "comments": events_json.get("comments", []),
+                "num_workers": parsed_args.num_workers}
+        if parsed_args.output_path is not None:
+            args["output_path"] = os.path.abspath(parsed_args.output_path)
+
+    response = send_request(parsed_args.command, args, parsed_args.socket)
+
+    if not response["ok"]:
+        print(f"error: {response['error']}", file=sys.stderr)
+        return 1
+
+    result = response["result"]
+    if parsed_args.command == "render" and "output_path" not in args:
+        print(result["contents"])
+    else:
+        print(json.dumps(result, indent=4))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
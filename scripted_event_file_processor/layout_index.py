@@ -0,0 +1,208 @@
+"""
+Offset index for random access into large scripted event files.
+
+Building the index memory maps the file once and records where the legend lives along with the byte
+offset, length and frame offset of every layout block. With the index in hand, read_window only has to
+read and parse the blocks that overlap the requested time window instead of the whole file.
+
+The index is kept in memory and also written to a sidecar file next to the scripted event file, both
+are rebuilt automatically once the scripted event file changes.
+"""
+import bisect
+import mmap
+import os
+from typing import List, Dict, Optional
+
+from main import *
+
+LAYOUT_INDEX_SIDECAR_SUFFIX = ".index.json"
+
+# byte level equivalents of the patterns used by extract_legend and get_layout_blocks, the file is not
+# read in text mode here so both \n and \r\n line endings have to be accepted explicitly
+LAYOUT_BLOCK_PATTERN = re.compile(rb"^x-+\r?\n(.*?)^x-+", re.MULTILINE | re.DOTALL)
+LAYOUT_START_PATTERN = re.compile(rb"^[ \t]*----- event layout system start -----[ \t]*\r?$", re.MULTILINE)
+
+class LayoutBlockEntry:
+    def __init__(self, block_index: int, offset: int, length: int, frame_offset: int, timeline_start: int, start_tick: int, end_tick: int):
+        self.block_index = block_index  # position of the block in the file, counting only non empty blocks
+        self.offset = offset  # byte offset of the block contents, just after its opening x---- line
+        self.length = length  # length of the block contents in bytes
+        self.frame_offset = frame_offset  # the value of the block's frame: marker
+        self.timeline_start = timeline_start  # index of the block's timeline line
+        self.start_tick = start_tick
+        self.end_tick = end_tick  # no event in the block can be placed later than this
+
+    def to_dict(self) -> Dict:
+        return {
+            "block_index": self.block_index,
+            "offset": self.offset,
+            "length": self.length,
+            "frame_offset": self.frame_offset,
+            "timeline_start": self.timeline_start,
+            "start_tick": self.start_tick,
+            "end_tick": self.end_tick,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict) -> "LayoutBlockEntry":
+        return LayoutBlockEntry(data["block_index"], data["offset"], data["length"], data["frame_offset"], data["timeline_start"], data["start_tick"], data["end_tick"])
+
+class LayoutIndex:
+    def __init__(self, file_size: int, file_mtime_ns: int, legend_offset: int, legend_length: int, ticks_per_second: int, blocks: List[LayoutBlockEntry]):
+        self.file_size = file_size
+        self.file_mtime_ns = file_mtime_ns
+        self.legend_offset = legend_offset
+        self.legend_length = legend_length
+        self.ticks_per_second = ticks_per_second
+        self.blocks = blocks
+
+        # blocks ordered by start tick along with the running maximum of their end ticks, every block
+        # before the first running maximum that reaches t0 ends before t0 so it can be skipped by bisection
+        self.blocks_by_start = sorted(blocks, key=lambda block: block.start_tick)
+        self.block_start_ticks = [block.start_tick for block in self.blocks_by_start]
+        self.running_max_end_ticks = []
+        running_max_end_tick = None
+        for block in self.blocks_by_start:
+            running_max_end_tick = block.end_tick if running_max_end_tick is None else max(running_max_end_tick, block.end_tick)
+            self.running_max_end_ticks.append(running_max_end_tick)
+
+        self.legend: Optional[Dict] = None
+
+    def is_current(self, file_path: str) -> bool:
+        file_stat = os.stat(file_path)
+        return (file_stat.st_size, file_stat.st_mtime_ns) == (self.file_size, self.file_mtime_ns)
+
+    def get_overlapping_blocks(self, t0: int, t1: int) -> List[LayoutBlockEntry]:
+        lo = bisect.bisect_left(self.running_max_end_ticks, t0)
+        hi = bisect.bisect_right(self.block_start_ticks, t1)
+        return [block for block in self.blocks_by_start[lo:hi] if block.end_tick >= t0]
+
+    def to_dict(self) -> Dict:
+        return {
+            "file_size": self.file_size,
+            "file_mtime_ns": self.file_mtime_ns,
+            "legend_offset": self.legend_offset,
+            "legend_length": self.legend_length,
+            "ticks_per_second": self.ticks_per_second,
+            "blocks": [block.to_dict() for block in self.blocks],
+        }
+
+    @staticmethod
+    def from_dict(data: Dict) -> "LayoutIndex":
+        return LayoutIndex(data["file_size"], data["file_mtime_ns"], data["legend_offset"], data["legend_length"],
+                           data["ticks_per_second"], [LayoutBlockEntry.from_dict(block) for block in data["blocks"]])
+
+# maps a scripted event file path to its index, so repeated lookups don't touch the sidecar
+file_path_to_layout_index: Dict[str, LayoutIndex] = {}
+
+def build_layout_index(file_path: str) -> LayoutIndex:
+    logging.info(f"Building layout index for file: {file_path}")
+    file_stat = os.stat(file_path)
+
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+        # just like extract_legend, without a start marker the whole file is treated as the legend
+        layout_start_match = LAYOUT_START_PATTERN.search(contents)
+        legend_length = layout_start_match.start() if layout_start_match else len(contents)
+
+        timeline_start = None
+        frame_offset = None
+        ticks_per_second = -1
+        blocks = []
+
+        for match in LAYOUT_BLOCK_PATTERN.finditer(contents):
+            block = contents[match.start(1):match.end(1)].decode("utf-8").strip()
+            if not block:
+                continue
+
+            lines = block.splitlines()
+            timeline_start, frame_offset, ticks_per_second = find_block_header(lines, timeline_start, frame_offset, ticks_per_second)
+            if timeline_start is None:
+                logging.error("Timeline line not found in the file")
+                raise ValueError("Timeline line not found in the file")
+
+            longest_line_length = max(len(line.strip()) for line in lines)
+            start_tick = frame_offset * ticks_per_second
+            end_tick = start_tick + longest_line_length - len("| events     | ")
+            blocks.append(LayoutBlockEntry(len(blocks), match.start(1), match.end(1) - match.start(1), frame_offset, timeline_start, start_tick, end_tick))
+
+    logging.info(f"Indexed {len(blocks)} layout blocks.")
+    return LayoutIndex(file_stat.st_size, file_stat.st_mtime_ns, 0, legend_length, ticks_per_second, blocks)
+
+def get_layout_index_sidecar_path(file_path: str) -> str:
+    return file_path + LAYOUT_INDEX_SIDECAR_SUFFIX
+
+def write_layout_index(file_path: str, layout_index: LayoutIndex):
+    sidecar_path = get_layout_index_sidecar_path(file_path)
+    try:
+        with open(sidecar_path, "w") as file:
+            json.dump(layout_index.to_dict(), file)
+    except OSError as e:
+        # a read only directory only costs the next process a rebuild, the index is still kept in memory
+        logging.warning(f"Could not write layout index {sidecar_path}: {e}")
+        return
+    logging.debug(f"Layout index written to {sidecar_path}")
+
+def load_layout_index(file_path: str, use_sidecar: bool = True) -> LayoutIndex:
+    """
+    Returns an up to date index for the file, looking in memory first, then in the sidecar file and
+    finally building (and storing) a fresh one.
+    """
+    layout_index = file_path_to_layout_index.get(file_path)
+    if layout_index is not None and layout_index.is_current(file_path):
+        return layout_index
+
+    layout_index = None
+    sidecar_path = get_layout_index_sidecar_path(file_path)
+    if use_sidecar and os.path.exists(sidecar_path):
+        try:
+            with open(sidecar_path, "r") as file:
+                layout_index = LayoutIndex.from_dict(json.load(file))
+        except (ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable layout index {sidecar_path}: {e}")
+        if layout_index is not None and not layout_index.is_current(file_path):
+            logging.debug(f"Layout index {sidecar_path} is out of date.")
+            layout_index = None
+
+    if layout_index is None:
+        layout_index = build_layout_index(file_path)
+        if use_sidecar:
+            write_layout_index(file_path, layout_index)
+
+    file_path_to_layout_index[file_path] = layout_index
+    return layout_index
+
+def event_overlaps_window(event: Dict, t0: int, t1: int) -> bool:
+    if event["type"] == "toggle":
+        return event["start_tick"] <= t1 and event["end_tick"] >= t0
+    return t0 <= event["tick"] <= t1
+
+def read_window(file_path: str, t0: float, t1: float, use_sidecar: bool = True) -> List[Dict]:
+    """
+    Returns the events of a scripted event file that overlap the time window [t0, t1], only the layout
+    blocks overlapping the window are read and parsed.
+
+    The window is given in seconds and only shrinks to whole ticks, so an event just outside of it is never
+    returned, the events are returned in the same form as the json output.
+    """
+    layout_index = load_layout_index(file_path, use_sidecar)
+    if not layout_index.blocks:
+        return []
+
+    timebase = Timebase(layout_index.ticks_per_second)
+    t0_tick = timebase.seconds_to_ticks_at_or_after(t0)
+    t1_tick = timebase.seconds_to_ticks_at_or_before(t1)
+    overlapping_blocks = layout_index.get_overlapping_blocks(t0_tick, t1_tick)
+
+    events = []
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+        if layout_index.legend is None:
+            raw_legend = contents[layout_index.legend_offset:layout_index.legend_offset + layout_index.legend_length].decode("utf-8")
+            layout_index.legend = parse_legend_to_dictionary(raw_legend)
+
+        for block in overlapping_blocks:
+            timeline_segment = contents[block.offset:block.offset + block.length].decode("utf-8").strip()
+            block_events = parse_layout_block(timeline_segment, layout_index.legend, block.timeline_start, block.frame_offset,
+                                              layout_index.ticks_per_second, block.block_index)
+            events.extend(event for event in block_events if event_overlaps_window(event, t0_tick, t1_tick))
+
+    return convert_ticks_to_seconds({"ticks_per_second": layout_index.ticks_per_second, "events": events})["events"]
@@ -1,7 +1,10 @@
 import re
 import json
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from timebase import Timebase
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -78,8 +81,11 @@ def get_layout_blocks(file_path: str) -> List[str]:
     logging.info(f"Total number of layout blocks found: {len(layout_blocks)}")
     return layout_blocks
 
-def calculate_dash_duration(timeline_str: str, frame_unit: int) -> float:
-    logging.debug("Starting calculation of dash duration.")
+def calculate_number_of_time_subdivisions(timeline_str: str) -> int:
+    """
+    Counts how many dashes make up one frame unit in a frame line, each dash is one tick.
+    """
+    logging.debug("Starting calculation of the number of time subdivisions.")
     
     try:
         # Find the position of the first frame marker after the first '|'
@@ -102,13 +108,10 @@ def calculate_dash_duration(timeline_str: str, frame_unit: int) -> float:
             raise ValueError("No dashes found between '0' and '1'.")
 
         total_number_of_time_subdivisions = dashes_between + 1
-        
-        # Calculate the duration of one dash
-        duration_per_dash = frame_unit / total_number_of_time_subdivisions
-        
-        logging.debug(f"Calculated duration per dash: {duration_per_dash} seconds.")
-        
-        return duration_per_dash
+
+        logging.debug(f"Calculated number of time subdivisions: {total_number_of_time_subdivisions}.")
+
+        return total_number_of_time_subdivisions
     
     except ValueError as e:
         logging.error(f"ValueError: {e}")
@@ -117,8 +120,173 @@ def calculate_dash_duration(timeline_str: str, frame_unit: int) -> float:
         logging.error(f"Unexpected error: {e}")
         raise
 
+def find_block_header(lines: List[str], timeline_start, frame_offset, ticks_per_second: int):
+    """
+    Locates the timeline line and the frame offset of a layout block, values that are missing in
+    this block are carried over from the previous block just like the serial parser always did.
+
+    The tick rate is taken from the first frame line, one tick per dash.
+    """
+    for i, line in enumerate(lines):
+        if "| timeline" in line:
+            timeline_start = i
+            logging.debug(f"Found timeline start at line: {i}")
+        if "frame:" in line:
+            frame_line = lines[i]
+            # TODO generalize this
+            # the frame unit is always 1s for now, so the dashes in one frame unit are the ticks per second
+            if (ticks_per_second == -1):
+                ticks_per_second = calculate_number_of_time_subdivisions(frame_line)
+                logging.debug(f"The tick rate is {ticks_per_second} ticks per second.")
+            frame_offset = int(re.search(r"frame:\s+(\d+)", frame_line).group(1))
+            logging.debug(f"Found frame offset: {frame_offset}")
+            break
 
-def parse_event_layout(file_path: str, legend: Dict) -> Dict:
+    return timeline_start, frame_offset, ticks_per_second
+
+def pair_toggle_tags(line: str) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Scans the >key and <key tags of an event line separately and pairs them per key, returning tuples
+    of (key, start column, end column).
+
+    Every <key closes the nearest >key before it that is still open. What is left over on the line
+    can't form a regular toggle: a <key followed by a >key gives an inverted pair whose end column
+    comes before its start column, and any other tag is returned with None for its missing side.
+    """
+    key_to_open_starts: Dict[str, List[int]] = defaultdict(list)
+    key_to_leftover_tags: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    pairs = []
+
+    for match in re.finditer(r"([<>])([A-Za-z0-9]+)", line):
+        direction, key = match.groups()
+        if direction == ">":
+            key_to_open_starts[key].append(match.start())
+        elif key_to_open_starts[key]:
+            pairs.append((key, key_to_open_starts[key].pop(), match.start()))
+        else:
+            key_to_leftover_tags[key].append((match.start(), "<"))
+
+    for key, open_starts in key_to_open_starts.items():
+        key_to_leftover_tags[key].extend((start_column, ">") for start_column in open_starts)
+
+    for key, leftover_tags in key_to_leftover_tags.items():
+        pending_ends = []
+        for column, direction in sorted(leftover_tags):
+            if direction == "<":
+                pending_ends.append(column)
+            elif pending_ends:
+                pairs.append((key, column, pending_ends.pop()))
+            else:
+                pairs.append((key, column, None))
+        pairs.extend((key, None, end_column) for end_column in pending_ends)
+
+    pairs.sort(key=lambda pair: min(column for column in pair[1:] if column is not None))
+    return pairs
+
+def parse_layout_block(timeline_segment: str, legend: Dict, timeline_start: int, frame_offset: int, ticks_per_second: int,
+                       block_index: int = 0, strict: bool = True) -> List[Dict]:
+    """
+    Extracts the events of a single layout block, event times are given in ticks. Every event also
+    records its key and where it was found (block, line within the block and column within the line).
+
+    Toggle tags are paired by pair_toggle_tags in both modes, so validation sees exactly the toggles
+    that a conversion produces. When strict is False events with a key missing from the legend are kept
+    with a name of None rather than raising, and unmatched and inverted toggles are kept too, with a
+    start or end tick of None when a side is missing. This is what lets validation report them.
+    """
+    events = []
+    frame_offset_tick = frame_offset * ticks_per_second
+    lines = timeline_segment.splitlines()
+
+    # Parse event lines
+    for i, line in enumerate(lines[:timeline_start]):
+        line = line.strip()
+
+        if not line or line.startswith("| comments"):
+            logging.debug(f"Skipping empty or comment line at index {i}: {line}")
+            continue
+
+        # at this point its guarenteed that we're working on a event line
+
+        playthrough_matches = re.finditer(r"(\*)([A-Za-z]+)", line)
+        # a toggle ends on the column of its closing '<', not on the last character of the closing key
+        toggle_matches = pair_toggle_tags(line)
+
+        for match in playthrough_matches:
+            event_type, key = match.groups()
+            frame_position = match.start() - len("| events     | ")
+            tick_of_event = frame_offset_tick + frame_position
+
+            logging.debug(f"Processing event: {event_type}{key} at frame position {frame_position}, tick {tick_of_event}")
+
+            if key in legend:
+                event_name = legend[key]["name"]
+            elif strict:
+                logging.error(f"Unknown event key '{key}' in the layout at line {i}")
+                raise ValueError(f"Unknown event key '{key}' in the layout")
+            else:
+                event_name = None
+
+            assert ticks_per_second != -1
+            event = {
+                "name": event_name,
+                "tick": tick_of_event,
+                "type": "playthrough",
+                "key": key,
+                "block": block_index,
+                "line": i,
+                "column": match.start()
+            }
+            logging.debug(f"Adding event: {event}")
+            events.append(event)
+
+        for match in toggle_matches:
+            key, start_time, end_time = match
+
+            if strict and (start_time is None or end_time is None or end_time < start_time):
+                column = start_time if start_time is not None else end_time
+                logging.error(f"Unmatched toggle tag for key '{key}' in the layout at line {i}, column {column}")
+                raise ValueError(f"Unmatched toggle tag for key '{key}' at line {i}, column {column} of the layout")
+
+            start_tick = None if start_time is None else frame_offset_tick + start_time - len("| events     | ")
+            end_tick = None if end_time is None else frame_offset_tick + end_time - len("| events     | ")
+
+            if key in legend:
+                event_name = legend[key]["name"]
+            elif strict:
+                logging.error(f"Unknown event key '{key}' in the layout at line {i}")
+                raise ValueError(f"Unknown event key '{key}' in the layout")
+            else:
+                event_name = None
+
+            assert ticks_per_second != -1
+            event = {
+                "name": event_name,
+                "start_tick": start_tick,
+                "end_tick": end_tick,
+                "type": "toggle",
+                "key": key,
+                "block": block_index,
+                "line": i,
+                "column": start_time if start_time is not None else end_time,
+                "end_column": end_time
+            }
+            logging.debug(f"Adding event: {event}")
+            events.append(event)
+
+    return events
+
+def parse_event_layout(file_path: str, legend: Dict, num_workers: int = 1, use_processes: bool = True, strict: bool = True) -> Dict:
+    """
+    Parses every layout block of a scripted event file.
+
+    Event times are returned in ticks along with the tick rate, use convert_ticks_to_seconds to get
+    the json representation.
+
+    When num_workers is greater than one a cheap pre-pass first resolves the timeline line, frame offset
+    and the shared tick rate of every block, after which the blocks are parsed concurrently and
+    their events are concatenated in block order, giving the same result as the serial parser.
+    """
     logging.debug(f"Parsing event layout from file: {file_path}")
     events = []
 
@@ -129,94 +297,63 @@ def parse_event_layout(file_path: str, legend: Dict) -> Dict:
 
     timeline_segments : List[str] = get_layout_blocks(file_path)
 
-    duration_of_tick = -1
-
-    for timeline_segment in timeline_segments:
+    ticks_per_second = -1
 
-        lines = timeline_segment.splitlines()
-
-        for i, line in enumerate(lines):
-            if "| timeline" in line:
-                timeline_start = i
-                logging.debug(f"Found timeline start at line: {i}")
-            if "frame:" in line:
-                frame_line = lines[i]
-                # TODO generalize this
-                if (duration_of_tick == -1):
-                    duration_of_tick = calculate_dash_duration(frame_line, 1)
-                    print(f"The duration of one dash is {duration_of_tick} seconds.")
-                frame_offset = int(re.search(r"frame:\s+(\d+)", frame_line).group(1))
-                logging.debug(f"Found frame offset: {frame_offset}")
-                break
+    block_headers = []
+    for block_index, timeline_segment in enumerate(timeline_segments):
+        timeline_start, frame_offset, ticks_per_second = find_block_header(timeline_segment.splitlines(), timeline_start, frame_offset, ticks_per_second)
 
         if timeline_start is None:
             logging.error("Timeline line not found in the file")
             raise ValueError("Timeline line not found in the file")
 
-        # Parse event lines
-        for i, line in enumerate(lines[:timeline_start]):
-            print("DEBOGGGING", line)
-            line = line.strip()
-
-            if not line or line.startswith("| comments"):
-                logging.debug(f"Skipping empty or comment line at index {i}: {line}")
-                continue
-
-            # at this point its guarenteed that we're working on a event line
-
-            playthrough_matches = re.finditer(r"(\*)([A-Za-z]+)", line)
-            toggle_matches = [(m.group(1), m.start(), m.end() - 1) for m in re.finditer(r">([A-Za-z0-9]+)~*.*?<\1", line)]
-
-            for match in playthrough_matches:
-                event_type, key = match.groups()
-                frame_position = match.start() - len("| events     | ")
-                frame_of_event = frame_offset + frame_position * duration_of_tick
-
-                logging.debug(f"Processing event: {event_type}{key} at frame position {frame_position}, frame time {frame_of_event}")
-
-                if key not in legend:
-                    logging.error(f"Unknown event key '{key}' in the layout at line {i}")
-                    raise ValueError(f"Unknown event key '{key}' in the layout")
-
-                event_info = legend[key]
-                event_name = event_info["name"]
-
-                assert duration_of_tick != -1
-                event = {
-                    "name": event_name,
-                    "time": frame_of_event ,
-                    "type": "playthrough"
-                }
-                logging.debug(f"Adding event: {event}")
-                events.append(event)
-
-            for match in toggle_matches:
-                key, start_time, end_time = match
-
-                start_frame_pos = start_time - len("| events     | ")
-                end_frame_pos = end_time - len("| events     | ")
-
-                start_frame = frame_offset + start_frame_pos * duration_of_tick
-                end_frame = frame_offset + end_frame_pos * duration_of_tick
-
-                if key not in legend:
-                    logging.error(f"Unknown event key '{key}' in the layout at line {i}")
-                    raise ValueError(f"Unknown event key '{key}' in the layout")
-
-                event_info = legend[key]
-                event_name = event_info["name"]
-
-                assert duration_of_tick != -1
-                event = {
-                    "name": event_name,
-                    "start_time": start_frame,
-                    "end_time": end_frame,
-                    "type": "toggle"
-                }
-                logging.debug(f"Adding event: {event}")
-                events.append(event)
+        if num_workers <= 1:
+            events.extend(parse_layout_block(timeline_segment, legend, timeline_start, frame_offset, ticks_per_second, block_index, strict))
+        else:
+            block_headers.append((timeline_start, frame_offset))
+
+    if num_workers > 1 and timeline_segments:
+        logging.info(f"Parsing {len(timeline_segments)} layout blocks on {num_workers} workers.")
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        num_blocks = len(timeline_segments)
+        # batch blocks together so that the per task overhead doesn't dominate on small blocks
+        chunksize = max(1, num_blocks // (num_workers * 4))
+        with executor_class(max_workers=num_workers) as executor:
+            # map yields results in submission order, so events stay in block order
+            for block_events in executor.map(parse_layout_block, timeline_segments, [legend] * num_blocks,
+                                             [header[0] for header in block_headers], [header[1] for header in block_headers],
+                                             [ticks_per_second] * num_blocks, range(num_blocks), [strict] * num_blocks,
+                                             chunksize=chunksize):
+                events.extend(block_events)
 
     logging.debug(f"Total events parsed: {len(events)}")
+    return {"ticks_per_second": ticks_per_second, "events": events}
+
+def convert_ticks_to_seconds(parsed_events: Dict) -> Dict:
+    """
+    Converts the tick based output of parse_event_layout into the json representation, which is the
+    only place where times are turned back into seconds.
+    """
+    # a file without any layout blocks never declares a tick rate
+    if not parsed_events["events"]:
+        return {"events": []}
+
+    timebase = Timebase(parsed_events["ticks_per_second"])
+    events = []
+    for event in parsed_events["events"]:
+        if event["type"] == "toggle":
+            events.append({
+                "name": event["name"],
+                "start_time": timebase.ticks_to_seconds(event["start_tick"]),
+                "end_time": timebase.ticks_to_seconds(event["end_tick"]),
+                "type": "toggle"
+            })
+        else:
+            events.append({
+                "name": event["name"],
+                "time": timebase.ticks_to_seconds(event["tick"]),
+                "type": "playthrough"
+            })
     return {"events": events}
 
 def write_to_json(output_path, data):
@@ -232,7 +369,7 @@ def convert_scripted_event_file_to_json_file(scripted_event_file_path: str, json
             raw_legend = extract_legend(file.read())
             legend = parse_legend_to_dictionary(raw_legend)
             parsed_events = parse_event_layout(scripted_event_file_path, legend)
-            write_to_json(json_output_path, parsed_events)
+            write_to_json(json_output_path, convert_ticks_to_seconds(parsed_events))
             logging.info(f"Events successfully written to {json_output_path}")
     except Exception as e:
         logging.exception("An error occurred while processing the event layout.")
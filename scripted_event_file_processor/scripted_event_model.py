@@ -0,0 +1,123 @@
+"""
+Python model of the runtime in scripted_events.cpp, it mirrors ScriptedEvent::run so that scripted
+events can be replayed and measured without building the engine.
+"""
+import json
+from typing import Callable, Dict, List, Optional
+
+class TemporalBinarySignal:
+    """
+    Model of the temporal_binary_signal dependency, a boolean that remembers its state from the
+    previous call to process so that rising and falling edges can be detected.
+    """
+    def __init__(self):
+        self.next_state = False
+        self.current_state = False
+        self.previous_state = False
+
+    def set_on(self):
+        self.next_state = True
+
+    def set_off(self):
+        self.next_state = False
+
+    def process(self):
+        self.previous_state = self.current_state
+        self.current_state = self.next_state
+
+    def is_just_on(self) -> bool:
+        return self.current_state and not self.previous_state
+
+    def is_just_off(self) -> bool:
+        return not self.current_state and self.previous_state
+
+class PlaythroughEvent:
+    def __init__(self, name: str, time: float):
+        self.name = name
+        self.time = time
+
+class TogglableEvent:
+    def __init__(self, name: str, start_time: float, end_time: float):
+        self.name = name
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def get_str_repr(self) -> str:
+        return f"event: {self.name} ({self.start_time}, {self.end_time})"
+
+class ScriptedEvent:
+    def __init__(self, events_json: Optional[Dict] = None):
+        self.current_time_seconds = 0.0
+        self.processed_playthrough_events = set()
+        self.playthrough_events: List[PlaythroughEvent] = []
+        self.togglable_events: List[TogglableEvent] = []
+        self.togglable_event_to_tbs: Dict[str, TemporalBinarySignal] = {}
+        self.playthrough_event_index = 0
+
+        if events_json is not None:
+            self.load_events(events_json)
+
+    def load_in_new_scripted_event(self, scripted_event_json_path: str):
+        with open(scripted_event_json_path, "r") as file:
+            self.load_events(json.load(file))
+
+    def load_events(self, events_json: Dict):
+        self.playthrough_events.clear()
+        self.togglable_events.clear()
+
+        if not isinstance(events_json.get("events"), list):
+            raise ValueError("Error parsing scripted scene: 'events' field must be an array!")
+
+        for event_json in events_json["events"]:
+            if event_json["type"] == "playthrough":
+                self.playthrough_events.append(PlaythroughEvent(event_json["name"], event_json["time"]))
+            elif event_json["type"] == "toggle":
+                self.togglable_events.append(TogglableEvent(event_json["name"], event_json["start_time"], event_json["end_time"]))
+            else:
+                raise ValueError(f"Unknown event type: {event_json['type']}")
+
+        # python's sorts are stable so equal times keep their file order here, the runtime uses std::sort
+        # which doesn't guarantee any order for equal times
+        self.playthrough_events.sort(key=lambda event: event.time)
+        self.togglable_events.sort(key=lambda event: event.start_time)
+
+    def reset_processed_state(self):
+        self.current_time_seconds = 0.0
+        self.playthrough_event_index = 0
+        self.processed_playthrough_events.clear()
+
+    def run(self, delta_time: float, event_callbacks: Dict[str, Callable[[bool, bool], None]]):
+        self.current_time_seconds += delta_time
+
+        # playthrough events are consumed in time order, each name only ever fires once
+        while (self.playthrough_event_index < len(self.playthrough_events) and
+               self.playthrough_events[self.playthrough_event_index].time <= self.current_time_seconds):
+            event = self.playthrough_events[self.playthrough_event_index]
+
+            if event.name in event_callbacks:
+                if event.name not in self.processed_playthrough_events:
+                    event_callbacks[event.name](True, True)
+                    self.processed_playthrough_events.add(event.name)
+            else:
+                print(f"[event script] No callback registered for playthrough event: {event.name}")
+
+            self.playthrough_event_index += 1
+
+        for toggle_event in self.togglable_events:
+            curr_tbs = self.togglable_event_to_tbs.setdefault(toggle_event.get_str_repr(), TemporalBinarySignal())
+            event_is_toggled = toggle_event.start_time <= self.current_time_seconds <= toggle_event.end_time
+
+            if event_is_toggled:
+                curr_tbs.set_on()
+            else:
+                curr_tbs.set_off()
+            curr_tbs.process()
+
+            if toggle_event.name in event_callbacks:
+                if event_is_toggled:
+                    event_callbacks[toggle_event.name](curr_tbs.is_just_on(), False)
+                elif curr_tbs.is_just_off():
+                    # this is the last call of this callback
+                    event_callbacks[toggle_event.name](False, True)
+            else:
+                print(f"[event script] No callback registered for toggle event: {toggle_event.name}")
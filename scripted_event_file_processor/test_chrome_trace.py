@@ -0,0 +1,39 @@
+import pytest
+
+from chrome_trace import REPLAY_PID, convert_events_json_to_chrome_trace, replay_scripted_event
+
+EVENTS_JSON = {
+    "events": [
+        {"name": "smoke", "start_time": 0.5, "end_time": 1.0, "type": "toggle"},
+        {"name": "grab", "time": 0.25, "type": "playthrough"},
+    ]
+}
+
+def test_export_puts_each_event_name_on_its_own_track():
+    trace_events = [event for event in convert_events_json_to_chrome_trace(EVENTS_JSON) if event["ph"] != "M"]
+
+    toggle, playthrough = trace_events
+    assert (toggle["ph"], toggle["ts"], toggle["dur"]) == ("X", 500_000, 500_000)
+    assert (playthrough["ph"], playthrough["ts"]) == ("i", 250_000)
+    assert toggle["tid"] != playthrough["tid"]
+
+@pytest.mark.parametrize("delta_time", [0, -0.1])
+def test_replay_rejects_non_positive_delta_time(delta_time):
+    with pytest.raises(ValueError):
+        replay_scripted_event(EVENTS_JSON, delta_time)
+
+def test_replay_places_frames_and_callbacks_on_the_scripted_time_axis():
+    delta_time = 0.25
+    trace_events = replay_scripted_event(EVENTS_JSON, delta_time)
+
+    frames = [event for event in trace_events if event.get("cat") == "frame"]
+    for frame in frames:
+        assert frame["ts"] == pytest.approx(frame["args"]["scripted_time"] * 1_000_000)
+
+    # the grab playthrough at 0.25s fires in the first frame, the smoke toggle starts at 0.5s
+    callbacks = [event for event in trace_events if event.get("cat") == "callback"]
+    grab = next(event for event in callbacks if event["name"] == "grab")
+    first_smoke = next(event for event in callbacks if event["name"] == "smoke")
+    assert 250_000 <= grab["ts"] < 250_000 + frames[0]["dur"] + 1
+    assert 500_000 <= first_smoke["ts"] < 750_000
+    assert all(event["pid"] == REPLAY_PID for event in callbacks)
@@ -0,0 +1,116 @@
+import os
+import shutil
+import socket
+import threading
+
+import pytest
+
+from daemon import ScriptedEventDaemon, ScriptedEventDaemonServer, remove_stale_socket
+from daemon_client import send_request
+from main import *
+
+SAMPLE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def socket_path(tmp_path):
+    socket_path = os.path.join(tmp_path, "daemon.sock")
+    server = ScriptedEventDaemonServer(socket_path, ScriptedEventDaemon())
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    server_thread.join()
+
+def copy_sample(sample_name: str, tmp_path) -> str:
+    file_path = os.path.join(tmp_path, sample_name)
+    shutil.copyfile(os.path.join(SAMPLE_DIRECTORY, sample_name), file_path)
+    return file_path
+
+def parse_to_json(file_path: str) -> Dict:
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+    return convert_ticks_to_seconds(parse_event_layout(file_path, legend))
+
+def test_convert_writes_the_converters_json(socket_path, tmp_path):
+    scripted_event_file_path = copy_sample("smoking_event_2.txt", tmp_path)
+    json_output_path = os.path.join(tmp_path, "smoking_event_2.json")
+
+    response = send_request("convert", {"scripted_event_file_path": scripted_event_file_path, "json_output_path": json_output_path}, socket_path)
+
+    assert response["ok"]
+    with open(json_output_path, "r") as file:
+        assert json.load(file) == parse_to_json(scripted_event_file_path)
+
+def test_render_accepts_the_converters_json(socket_path):
+    events = [
+        {"name": "smoke", "start_time": 1.0, "end_time": 4.5, "type": "toggle"},
+        {"name": "burn", "start_time": 12.0, "end_time": 15.5, "type": "toggle"},
+        {"name": "grab", "time": 6.0, "type": "playthrough"},
+    ]
+
+    response = send_request("render", {"events": events}, socket_path)
+
+    assert response["ok"]
+    contents = response["result"]["contents"]
+    for event in events:
+        assert f"- {event['name']}\n" in contents
+    # every toggle is rendered as a toggle on and toggle off pair
+    assert len(re.findall(r"(?<=[ |])>[A-Za-z0-9]+~*<[A-Za-z0-9]+", contents)) == 2
+
+def test_render_rejects_events_of_an_unknown_shape(socket_path):
+    response = send_request("render", {"events": [{"name": "grab"}]}, socket_path)
+
+    assert not response["ok"]
+    assert "ValueError" in response["error"]
+
+def test_validate_drops_the_cached_parse_once_the_file_changes(socket_path, tmp_path):
+    scripted_event_file_path = copy_sample("smoking_event_2.txt", tmp_path)
+
+    response = send_request("validate", {"scripted_event_file_path": scripted_event_file_path}, socket_path)
+    assert response["ok"] and response["result"]["valid"]
+
+    with open(scripted_event_file_path, "r") as file:
+        contents = file.read()
+    with open(scripted_event_file_path, "w") as file:
+        file.write(contents.replace("| events     | *in", "| events     | *zz", 1))
+
+    response = send_request("validate", {"scripted_event_file_path": scripted_event_file_path}, socket_path)
+    assert response["ok"] and not response["result"]["valid"]
+    assert [issue["kind"] for issue in response["result"]["issues"]] == ["unknown_key"]
+
+def test_malformed_request_line_gets_an_error_response(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(b"this is not json\n")
+        with client.makefile("r", encoding="utf-8") as response_file:
+            response = json.loads(response_file.readline())
+
+    assert not response["ok"]
+    assert response["error"].startswith("Malformed request")
+
+def test_unknown_command_gets_an_error_response(socket_path):
+    response = send_request("explode", {}, socket_path)
+    assert response == {"ok": False, "error": "Unknown command: explode"}
+
+def test_refuses_to_take_over_the_socket_of_a_running_daemon(socket_path):
+    with pytest.raises(RuntimeError):
+        remove_stale_socket(socket_path)
+    assert os.path.exists(socket_path)
+
+def test_removes_a_stale_socket(tmp_path):
+    socket_path = os.path.join(tmp_path, "stale.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path)
+
+    remove_stale_socket(socket_path)
+    assert not os.path.exists(socket_path)
+
+def test_refuses_to_remove_a_path_that_is_not_a_socket(tmp_path):
+    file_path = os.path.join(tmp_path, "not_a_socket.txt")
+    with open(file_path, "w") as file:
+        file.write("keep me")
+
+    with pytest.raises(RuntimeError):
+        remove_stale_socket(file_path)
+    assert os.path.exists(file_path)
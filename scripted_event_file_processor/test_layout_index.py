@@ -0,0 +1,58 @@
+import os
+
+from main import *
+import layout_index
+from layout_index import build_layout_index, read_window
+
+SAMPLE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def parse_all_events(file_path: str) -> List[Dict]:
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+    return convert_ticks_to_seconds(parse_event_layout(file_path, legend))["events"]
+
+def copy_sample(sample_name: str, tmp_path, line_ending: str = "\n") -> str:
+    with open(os.path.join(SAMPLE_DIRECTORY, sample_name), "r") as file:
+        contents = file.read()
+    file_path = os.path.join(tmp_path, sample_name)
+    with open(file_path, "w", newline=line_ending) as file:
+        file.write(contents)
+    return file_path
+
+def test_read_window_over_whole_file_matches_full_parse(tmp_path):
+    file_path = copy_sample("smoking_event_2.txt", tmp_path)
+    assert read_window(file_path, 0, 1000) == parse_all_events(file_path)
+
+def test_read_window_only_returns_overlapping_events(tmp_path):
+    file_path = copy_sample("smoking_event_2.txt", tmp_path)
+    window_events = read_window(file_path, 11, 13)
+
+    assert window_events
+    for event in window_events:
+        if event["type"] == "toggle":
+            assert event["start_time"] <= 13 and event["end_time"] >= 11
+        else:
+            assert 11 <= event["time"] <= 13
+
+def test_read_window_handles_crlf_line_endings(tmp_path):
+    file_path = copy_sample("smoking_event.txt", tmp_path, "\r\n")
+
+    assert len(build_layout_index(file_path).blocks) == len(get_layout_blocks(file_path))
+    assert read_window(file_path, 0, 1000) == parse_all_events(file_path)
+    assert len(read_window(file_path, 0, 1000)) == 11
+
+def test_read_window_works_when_the_sidecar_cannot_be_written(tmp_path, monkeypatch):
+    file_path = copy_sample("smoking_event_2.txt", tmp_path)
+    unwritable_sidecar_path = os.path.join(tmp_path, "missing_directory", "smoking_event_2.txt.index.json")
+    monkeypatch.setattr(layout_index, "get_layout_index_sidecar_path", lambda file_path: unwritable_sidecar_path)
+
+    assert read_window(file_path, 0, 1000) == parse_all_events(file_path)
+    assert not os.path.exists(unwritable_sidecar_path)
+
+def test_read_window_does_not_snap_its_edges_onto_nearby_events(tmp_path):
+    file_path = copy_sample("smoking_event_2.txt", tmp_path)
+
+    assert "exhale" in [event["name"] for event in read_window(file_path, 12, 13)]
+    assert "exhale" not in [event["name"] for event in read_window(file_path, 12.04, 13)]
+    assert "exhale" not in [event["name"] for event in read_window(file_path, 11, 11.96)]
+    assert "exhale" in [event["name"] for event in read_window(file_path, 11, 3 * 4.1 - 0.3)]
@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from main import *
+
+SAMPLE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_FILES = ["smoking_event.txt", "smoking_event_2.txt"]
+
+def parse_sample(sample_name: str, num_workers: int = 1, use_processes: bool = True) -> Dict:
+    file_path = os.path.join(SAMPLE_DIRECTORY, sample_name)
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+    return parse_event_layout(file_path, legend, num_workers, use_processes)
+
+def build_timeline_from_sample(sample_name: str) -> Timeline:
+    parsed_events = parse_sample(sample_name)
+    timebase = Timebase(parsed_events["ticks_per_second"])
+    timeline = Timeline()
+    for event in parsed_events["events"]:
+        if event["type"] == "toggle":
+            timeline.add_event(event["key"], event["name"], timebase.ticks_to_seconds(event["start_tick"]), Action.TOGGLE_ON)
+            timeline.add_event(event["key"], event["name"], timebase.ticks_to_seconds(event["end_tick"]), Action.TOGGLE_OFF)
+        else:
+            timeline.add_event(event["key"], event["name"], timebase.ticks_to_seconds(event["tick"]), Action.PLAYTHROUGH)
+    return timeline
+
+def build_empty_timeline() -> Timeline:
+    return Timeline()
+
+def build_timeline_with_toggle_crossing_segments() -> Timeline:
+    timeline = Timeline()
+    timeline.add_event("cs", "cigarette smoke", 8.5, Action.TOGGLE_ON)
+    timeline.add_event("cs", "cigarette smoke", 12, Action.TOGGLE_OFF)
+    timeline.add_event("g", "grab", 9.9, Action.PLAYTHROUGH)
+    timeline.add_event("g", "grab", 10, Action.PLAYTHROUGH)
+    return timeline
+
+def build_timeline_with_comments_only() -> Timeline:
+    timeline = Timeline()
+    timeline.add_comment("grab cigs", 0.5)
+    timeline.add_comment("light it up", 4)
+    timeline.add_comment("inhale", 23.7)
+    return timeline
+
+TIMELINE_BUILDERS = {
+    "smoking_event.txt": lambda: build_timeline_from_sample("smoking_event.txt"),
+    "smoking_event_2.txt": lambda: build_timeline_from_sample("smoking_event_2.txt"),
+    "empty": build_empty_timeline,
+    "toggle_crossing_segments": build_timeline_with_toggle_crossing_segments,
+    "comments_only": build_timeline_with_comments_only,
+}
+
+@pytest.mark.parametrize("timeline_name", TIMELINE_BUILDERS)
+@pytest.mark.parametrize("use_processes", [True, False])
+def test_parallel_render_matches_serial_render(timeline_name, use_processes):
+    timeline = TIMELINE_BUILDERS[timeline_name]()
+    serial_output = timeline.generate_timeline()
+
+    for num_workers in [2, 4]:
+        assert timeline.generate_timeline(num_workers, use_processes) == serial_output
+
+@pytest.mark.parametrize("sample_name", SAMPLE_FILES)
+@pytest.mark.parametrize("use_processes", [True, False])
+def test_parallel_parse_matches_serial_parse_on_samples(sample_name, use_processes):
+    serial_events = parse_sample(sample_name)
+
+    for num_workers in [2, 4]:
+        assert parse_sample(sample_name, num_workers, use_processes) == serial_events
+
+@pytest.mark.parametrize("timeline_name", ["empty", "toggle_crossing_segments", "comments_only"])
+@pytest.mark.parametrize("use_processes", [True, False])
+def test_parallel_parse_matches_serial_parse_on_edge_cases(timeline_name, use_processes, tmp_path):
+    file_path = os.path.join(tmp_path, f"{timeline_name}.txt")
+    with open(file_path, "w") as file:
+        file.write(TIMELINE_BUILDERS[timeline_name]().generate_script_event_file_contents())
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+
+    # the renderer drops the closing tag of a toggle that crosses a segment, so strict parsing rejects
+    # that file; lenient parsing keeps the unmatched toggle, which the merge has to preserve too
+    serial_events = parse_event_layout(file_path, legend, strict=False)
+
+    for num_workers in [2, 4]:
+        assert parse_event_layout(file_path, legend, num_workers, use_processes, strict=False) == serial_events
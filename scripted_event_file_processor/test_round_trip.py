@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from main import *
+
+def write_and_parse(timeline: Timeline, tmp_path) -> Dict:
+    file_path = os.path.join(tmp_path, "round_trip.txt")
+    with open(file_path, "w") as file:
+        file.write(timeline.generate_script_event_file_contents())
+
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+    return parse_event_layout(file_path, legend)
+
+def test_render_then_parse_round_trips_playthroughs_and_toggles(tmp_path):
+    timeline = Timeline()
+    timeline.add_event("gc", "grab cigs", 0, Action.PLAYTHROUGH)
+    timeline.add_event("li", "light it up", 1.1, Action.PLAYTHROUGH)
+    timeline.add_event("csb", "cig starts burning", 2, Action.TOGGLE_ON)
+    timeline.add_event("csb", "cig starts burning", 3, Action.TOGGLE_OFF)
+    timeline.add_event("ex", "exhale", 6.3, Action.PLAYTHROUGH)
+    timeline.add_event("bs", "blowing smoke", 12.7, Action.TOGGLE_ON)
+    timeline.add_event("bs", "blowing smoke", 15.4, Action.TOGGLE_OFF)
+
+    json_events = convert_ticks_to_seconds(write_and_parse(timeline, tmp_path))["events"]
+
+    playthroughs = sorted((event["name"], event["time"]) for event in json_events if event["type"] == "playthrough")
+    toggles = sorted((event["name"], event["start_time"], event["end_time"]) for event in json_events if event["type"] == "toggle")
+
+    assert playthroughs == [("exhale", 6.3), ("grab cigs", 0.0), ("light it up", 1.1)]
+    assert toggles == [("blowing smoke", 12.7, 15.4), ("cig starts burning", 2.0, 3.0)]
+
+def test_render_then_parse_round_trips_ticks_exactly(tmp_path):
+    timeline = Timeline()
+    for i in range(40):
+        timeline.add_event("p" + "abcdefghij"[i % 10], f"playthrough {i % 10}", i * 0.7, Action.PLAYTHROUGH)
+    for i in range(5):
+        timeline.add_event("t" + "abcde"[i], f"toggle {i}", i * 5.3 + 0.2, Action.TOGGLE_ON)
+        timeline.add_event("t" + "abcde"[i], f"toggle {i}", i * 5.3 + 2.1, Action.TOGGLE_OFF)
+
+    parsed_events = write_and_parse(timeline, tmp_path)
+
+    assert parsed_events["ticks_per_second"] == timeline.timebase.ticks_per_second
+    parsed_ticks = sorted(event["tick"] for event in parsed_events["events"] if event["type"] == "playthrough")
+    parsed_toggles = sorted((event["start_tick"], event["end_tick"]) for event in parsed_events["events"] if event["type"] == "toggle")
+
+    assert parsed_ticks == sorted(e.tick for e in timeline.events if e.action == Action.PLAYTHROUGH)
+    on_ticks = sorted(e.tick for e in timeline.events if e.action == Action.TOGGLE_ON)
+    off_ticks = sorted(e.tick for e in timeline.events if e.action == Action.TOGGLE_OFF)
+    assert parsed_toggles == list(zip(on_ticks, off_ticks))
+
+@pytest.mark.parametrize("frame_unit", [2, 3])
+def test_render_then_parse_round_trips_with_a_frame_unit_other_than_one(frame_unit, tmp_path):
+    timeline = Timeline(frame_unit=frame_unit)
+    timeline.add_event("g", "grab", 12, Action.PLAYTHROUGH)
+    timeline.add_event("s", "smoke", 3.5, Action.TOGGLE_ON)
+    timeline.add_event("s", "smoke", 6.2, Action.TOGGLE_OFF)
+
+    json_events = convert_ticks_to_seconds(write_and_parse(timeline, tmp_path))["events"]
+
+    assert sorted((event["name"], event.get("time"), event.get("start_time"), event.get("end_time")) for event in json_events) == [
+        ("grab", 12.0, None, None),
+        ("smoke", None, 3.5, 6.2),
+    ]
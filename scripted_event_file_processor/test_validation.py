@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from main import *
+from validation import validate_events, validate_scripted_event_file
+
+LEGEND = """legend
+- grab
+  - key: g
+  - type: playthrough
+- smoke
+  - key: s
+  - type: toggle
+
+----- event layout system start -----
+
+"""
+
+TIMELINE_FOOTER = """| timeline   | |---------|---------|---------|---------|---------|---------|---------|---------|---------|---------|
+| frame: 000 | 0---------1---------2---------3---------4---------5---------6---------7---------8---------9---------10
+x---------------------------------------------------------------------------------------------------------------------
+"""
+
+def write_layout(tmp_path, event_lines: List[str]) -> str:
+    file_path = os.path.join(tmp_path, "layout.txt")
+    with open(file_path, "w") as file:
+        file.write(LEGEND)
+        file.write("x--------------------------------------------------------------------------------------------------------------------\n")
+        file.write("".join(f"| events     | {event_line}\n" for event_line in event_lines))
+        file.write(TIMELINE_FOOTER)
+    return file_path
+
+def issue_summary(issues) -> List[Tuple]:
+    return [(issue.kind, issue.block, issue.line, issue.column) for issue in issues]
+
+def test_pair_toggle_tags_pairs_regular_inverted_and_unmatched_tags():
+    assert pair_toggle_tags(">a~~<a") == [("a", 0, 4)]
+    assert pair_toggle_tags("<a   >a") == [("a", 5, 0)]
+    assert pair_toggle_tags(">a   >b~~<b") == [("a", 0, None), ("b", 5, 9)]
+    assert pair_toggle_tags("<a") == [("a", None, 0)]
+
+def test_well_formed_sample_files_have_no_issues():
+    sample_directory = os.path.dirname(os.path.abspath(__file__))
+    for sample_name in ["smoking_event_2.txt", "exported_smoking_event.txt"]:
+        assert validate_scripted_event_file(os.path.join(sample_directory, sample_name)) == []
+
+def test_inverted_toggle_is_reported(tmp_path):
+    file_path = write_layout(tmp_path, ["<s   >s"])
+    assert issue_summary(validate_scripted_event_file(file_path)) == [("inverted_toggle", 0, 0, 20)]
+
+def test_unmatched_toggle_tags_are_reported(tmp_path):
+    file_path = write_layout(tmp_path, [">s", "          <s"])
+    assert issue_summary(validate_scripted_event_file(file_path)) == [
+        ("unmatched_toggle", 0, 0, 15),
+        ("unmatched_toggle", 0, 1, 25),
+    ]
+
+def test_unknown_key_is_reported(tmp_path):
+    file_path = write_layout(tmp_path, ["          *zz"])
+    assert issue_summary(validate_scripted_event_file(file_path)) == [("unknown_key", 0, 0, 25)]
+
+def test_overlapping_toggles_with_the_same_name_are_reported(tmp_path):
+    # toggles are inclusive at both ends, so starting on the tick another one ends still overlaps
+    file_path = write_layout(tmp_path, [">s~~~~~~~<s", "         >s~~~~<s", "                        >s~~~<s"])
+    assert issue_summary(validate_scripted_event_file(file_path)) == [("overlapping_toggle", 0, 1, 24)]
+
+def test_duplicate_playthroughs_are_reported(tmp_path):
+    file_path = write_layout(tmp_path, ["*g   *g", "*g"])
+    assert issue_summary(validate_scripted_event_file(file_path)) == [("duplicate_playthrough", 0, 1, 15)]
+
+def test_zero_length_toggle_is_reported():
+    # a layout can't place both tags of a toggle on one column, so this builds the event directly
+    events = [{"name": "smoke", "start_tick": 5, "end_tick": 5, "type": "toggle", "key": "s", "block": 2, "line": 1, "column": 20, "end_column": 20}]
+    assert issue_summary(validate_events(events)) == [("empty_toggle", 2, 1, 20)]
+
+def test_issues_are_ordered_by_tick_then_location(tmp_path):
+    file_path = write_layout(tmp_path, [
+        "                                    *zz",
+        "    >s~~~~~~~<s",
+        "     >s~~~<s        <s",
+    ])
+    issues = validate_scripted_event_file(file_path)
+
+    assert [issue.kind for issue in issues] == ["overlapping_toggle", "unmatched_toggle", "unknown_key"]
+    assert [issue.tick for issue in issues] == sorted(issue.tick for issue in issues)
+
+@pytest.mark.parametrize("event_line", [">ab~~<a", ">c~~~<cs", "<s   >s", ">s"])
+def test_strict_parsing_rejects_toggle_tags_that_validation_reports(event_line, tmp_path):
+    file_path = write_layout(tmp_path, [event_line])
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+
+    with pytest.raises(ValueError):
+        parse_event_layout(file_path, legend)
+    assert validate_scripted_event_file(file_path)
+
+def test_strict_and_lenient_parsing_read_the_same_toggles(tmp_path):
+    file_path = write_layout(tmp_path, [">s~~>s~~<s~~<s"])
+    with open(file_path, "r") as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+
+    strict_events = parse_event_layout(file_path, legend)["events"]
+    assert strict_events == parse_event_layout(file_path, legend, strict=False)["events"]
+    assert len(strict_events) == 2
+    assert [issue.kind for issue in validate_events(strict_events)] == ["overlapping_toggle"]
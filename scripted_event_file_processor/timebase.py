@@ -0,0 +1,34 @@
+import math
+
+class Timebase:
+    """
+    Fixed point representation of time, times are stored as an integer number of ticks at a declared
+    rate of ticks per second. Everything between parsing and rendering works in ticks so that it only
+    uses integer arithmetic, seconds only show up when reading or writing json.
+    """
+    def __init__(self, ticks_per_second: int):
+        if ticks_per_second <= 0:
+            raise ValueError(f"The tick rate must be positive, got {ticks_per_second}")
+        self.ticks_per_second = ticks_per_second
+
+    def seconds_to_ticks(self, seconds: float) -> int:
+        """
+        Quantizes a time in seconds to the nearest tick.
+        """
+        return round(seconds * self.ticks_per_second)
+
+    def seconds_to_ticks_at_or_after(self, seconds: float) -> int:
+        """
+        Returns the first tick that is not earlier than the time in seconds, the product is rounded to a
+        few decimals first so that float error such as 1.1 * 10 = 11.000000000000002 does not skip a tick.
+        """
+        return math.ceil(round(seconds * self.ticks_per_second, 9))
+
+    def seconds_to_ticks_at_or_before(self, seconds: float) -> int:
+        """
+        Returns the last tick that is not later than the time in seconds.
+        """
+        return math.floor(round(seconds * self.ticks_per_second, 9))
+
+    def ticks_to_seconds(self, ticks: int) -> float:
+        return ticks / self.ticks_per_second
@@ -1,10 +1,11 @@
 from enum import Enum
 from typing import Tuple, List, Dict
 from collections import defaultdict
-from math_utils.main import get_decimal_part, round_to_decimal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from text_utils.main import generate_unique_abbreviation, insert_and_clobber
 from collection_utils.main import are_elements_unique
 from user_input.main import *
+from timebase import Timebase
 import logging
 import os
 import json
@@ -56,15 +57,15 @@ class Action(Enum):
     TOGGLE_OFF = "toggle_off"
 
 class Comment:
-    def __init__(self, contents: str, time: float):
+    def __init__(self, contents: str, tick: int):
         self.contents = contents
-        self.time = time
+        self.tick = tick
 
 class Event: 
-    def __init__(self, uid: str, name: str, time: float, action: Action):
+    def __init__(self, uid: str, name: str, tick: int, action: Action):
         self.uid = uid
         self.name = name
-        self.time = time
+        self.tick = tick
         self.action = action
 
 class Timeline:
@@ -72,6 +73,11 @@ class Timeline:
         self.frame_unit = frame_unit  # The duration of one frame unit in seconds
         self.num_time_units_per_timeline_segment = num_time_units_per_timeline_segment # Duration of one segment in seconds
         self.num_subdivisions_per_time_unit = num_subdivisions_per_time_unit  # Number of dashes per segment
+        # one tick per dash, times are only in seconds when they are added to the timeline. The legend always
+        # declares a frame unit of 1s and the parser reads the tick rate from the dashes per unit, so the
+        # rate is the number of subdivisions no matter what frame_unit is set to
+        self.timebase = Timebase(num_subdivisions_per_time_unit)
+        self.num_ticks_per_timeline_segment = num_time_units_per_timeline_segment * num_subdivisions_per_time_unit
         self.events : List[Event] = []  # List to store events
         self.comments : List[Comment] = [] 
     
@@ -85,7 +91,7 @@ class Timeline:
         return uid_to_event_name
 
     def add_comment(self, comment: str, time: float):
-        self.comments.append(Comment(comment, time))
+        self.comments.append(Comment(comment, self.timebase.seconds_to_ticks(time)))
 
     def add_event_automatic_uid(self, name: str, time: float, action: Action):
         uid = generate_unique_abbreviation(self.get_current_event_uids(), name)
@@ -97,45 +103,22 @@ class Timeline:
                 print("you tried to add an event with the same uid as another event but with a different name since uid -> event name mappings must be unique, this is a problem")
                 return
 
-        self.events.append(Event(uid, name, time, action))
+        self.events.append(Event(uid, name, self.timebase.seconds_to_ticks(time), action))
 
 
-    def convert_time_to_segment_and_dash_index(self, time: float) -> Tuple[int, int]:
+    def convert_tick_to_segment_and_dash_index(self, tick: int) -> Tuple[int, int]:
         """
-        Converts a given time to the corresponding timeline segment index and dash index.
+        Converts a given tick to the corresponding timeline segment index and dash index.
 
         Parameters:
-            time (float): The time to convert.
+            tick (int): The tick to convert.
 
         Returns:
             Tuple[int, int]: The timeline segment index and dash index.
         """
-        logger.info(f"Converting time: {time}")
-
-        timeline_segment_index = int(time / self.num_time_units_per_timeline_segment)
-        logger.debug(f"Calculated timeline_segment_index: {timeline_segment_index}")
-
-        time_mod_segment = time % self.num_time_units_per_timeline_segment
-
-        subinterval_decimal = 1 / self.num_subdivisions_per_time_unit
-        logger.debug(f"Subinterval decimal: {subinterval_decimal}")
-
-        rounded_to_subinterval_time = round_to_decimal(time_mod_segment, subinterval_decimal)
-        logger.debug(f"Rounded to subinterval time: {rounded_to_subinterval_time}")
-
-        total_num_units = int(rounded_to_subinterval_time)
-        logger.debug(f"Total number of units: {total_num_units}")
-
-        left_over_units: float = get_decimal_part(rounded_to_subinterval_time)
-        logger.debug(f"Left over units: {left_over_units}")
-
-        left_over_dash_index = int(left_over_units * self.num_subdivisions_per_time_unit)
-        logger.debug(f"Left over dash index: {left_over_dash_index}")
-
-        dash_index = total_num_units * self.num_subdivisions_per_time_unit + left_over_dash_index
-        logger.debug(f"Calculated dash index: {dash_index}")
-
-        logger.info(f"Conversion result - Timeline Segment Index: {timeline_segment_index}, Dash Index: {dash_index}")
+        # a dash is exactly one tick so this is just integer division
+        timeline_segment_index, dash_index = divmod(tick, self.num_ticks_per_timeline_segment)
+        logger.debug(f"Converted tick {tick} - Timeline Segment Index: {timeline_segment_index}, Dash Index: {dash_index}")
 
         return timeline_segment_index, dash_index
 
@@ -166,7 +149,7 @@ class Timeline:
         for event in action_type_to_event.get(Action.PLAYTHROUGH, []):
             logger.debug(f"Processing PLAYTHROUGH event: {event}")
             event_string = f"*{event.uid}"
-            segment_index, dash_index = self.convert_time_to_segment_and_dash_index(event.time)
+            segment_index, dash_index = self.convert_tick_to_segment_and_dash_index(event.tick)
             event_interval = (dash_index, dash_index + len(event_string))
             logger.debug(f"PLAYTHROUGH event string: {event_string}, interval: {event_interval}")
             event_intervals.append(event_interval)
@@ -176,7 +159,7 @@ class Timeline:
         processed_toggle_off_events = []
         for event in action_type_to_event.get(Action.TOGGLE_ON, []):
             logger.debug(f"Processing TOGGLE_ON event: {event}")
-            segment_index, dash_index = self.convert_time_to_segment_and_dash_index(event.time)
+            segment_index, dash_index = self.convert_tick_to_segment_and_dash_index(event.tick)
             event_string = f">{event.uid}"
             toggle_off_event = None
             end_event_dash_index = None
@@ -184,7 +167,7 @@ class Timeline:
             for other_event in action_type_to_event.get(Action.TOGGLE_OFF, []):
                 logging.debug(f"comparing: {other_event.uid} {event.uid}")
                 if other_event.uid == event.uid and other_event not in processed_toggle_off_events:
-                    _, end_event_dash_index = self.convert_time_to_segment_and_dash_index(other_event.time)
+                    _, end_event_dash_index = self.convert_tick_to_segment_and_dash_index(other_event.tick)
                     toggle_off_event = other_event
                     processed_toggle_off_events.append(toggle_off_event)
                     break
@@ -223,8 +206,7 @@ class Timeline:
         comment_intervals = []
         for comment in curr_segment_comments:
             contents = comment.contents
-            comment_time = comment.time
-            _, comment_dash_index = self.convert_time_to_segment_and_dash_index(comment_time)
+            _, comment_dash_index = self.convert_tick_to_segment_and_dash_index(comment.tick)
             comment_dash_index_end = comment_dash_index + len(contents)
             comment_interval = (comment_dash_index, comment_dash_index_end)
             comment_intervals.append(comment_interval)
@@ -248,54 +230,104 @@ class Timeline:
         return comment_lines
 
 
-    # TODO was just pasted this in for debuggging because only seeing one timeline segment
-    def generate_timeline(self) -> str:
+    def generate_timeline_segment(self, segment_index: int, segment_events: List[Event], segment_comments: List[Comment]) -> List[str]:
+        """
+        Renders a single timeline segment, each segment only depends on its own events and comments
+        which is what allows segments to be rendered independently of each other.
+        """
+        logging.debug(f"Processing segment {segment_index}.")
+        segment_output = []
+        segment_output.append("x--------------------------------------------------------------------------------------------------------------------")
+
+        logging.debug(f"Found {len(segment_events)} events and {len(segment_comments)} comments for segment {segment_index}.")
+
+        # Add comments (names of events in the current segment)
+        comment_lines = self.generate_comment_lines(segment_comments)
+        segment_output.extend(comment_lines)
+        logging.debug(f"Added {len(comment_lines)} comment lines for segment {segment_index}.")
+
+        # Add event actions in the current segment
+        event_lines = self.generate_events_line_for_timeline_segment(segment_events)
+        segment_output.extend(event_lines)
+        logging.debug(f"Added {len(event_lines)} event lines for segment {segment_index}.")
+
+        # Add timeline frame (with dashes per segment)
+        timeline_line = "| timeline   | " + ("|" + "-" * (self.num_subdivisions_per_time_unit - 1)) * self.num_time_units_per_timeline_segment
+        segment_output.append(timeline_line)
+        logging.debug(f"Added timeline frame for segment {segment_index}.")
+
+        # Add frame markers with dashes between them
+        frame_line = f"| frame: {segment_index * self.num_time_units_per_timeline_segment:03d} | "
+        frame_line += "".join([str(i) + "-" * (self.num_subdivisions_per_time_unit - 1) for i in range(self.num_time_units_per_timeline_segment)])
+        segment_output.append(frame_line)
+        logging.debug(f"Added frame line for segment {segment_index}.")
+
+        # Add separator between segments
+        segment_output.append("x--------------------------------------------------------------------------------------------------------------------")
+        logging.debug(f"Added separator for segment {segment_index}.")
+
+        return segment_output
+
+    def partition_by_segment(self, num_segments: int) -> Tuple[List[List[Event]], List[List[Comment]]]:
+        """
+        Buckets events and comments by the segment they land in using a single pass over each list,
+        insertion order within a segment is preserved so rendering stays deterministic.
+        """
+        events_per_segment: List[List[Event]] = [[] for _ in range(num_segments)]
+        comments_per_segment: List[List[Comment]] = [[] for _ in range(num_segments)]
+
+        for e in self.events:
+            segment_index = e.tick // self.num_ticks_per_timeline_segment
+            if 0 <= segment_index < num_segments:
+                events_per_segment[segment_index].append(e)
+        for c in self.comments:
+            segment_index = c.tick // self.num_ticks_per_timeline_segment
+            if 0 <= segment_index < num_segments:
+                comments_per_segment[segment_index].append(c)
+
+        return events_per_segment, comments_per_segment
+
+    def generate_timeline(self, num_workers: int = 1, use_processes: bool = True) -> str:
+        """
+        Generates the timeline for every segment.
+
+        Parameters:
+            num_workers (int): When greater than one the segments are rendered on a worker pool of this size,
+                the output is identical to the serial renderer.
+            use_processes (bool): Use a process pool rather than a thread pool for the parallel renderer.
+
+        Returns:
+            str: The rendered timeline.
+        """
         logging.info("Starting to generate the timeline.")
         timeline_output = []
         
         # Calculate how many segments we need
-        max_event_time = max([e.time for e in self.events], default=0)
-        max_comment_time = max([c.time for c in self.comments], default=0)
-        max_time = max(max_event_time, max_comment_time)
-        num_segments = int((max_time // self.num_time_units_per_timeline_segment) + 1)
+        max_event_tick = max([e.tick for e in self.events], default=0)
+        max_comment_tick = max([c.tick for c in self.comments], default=0)
+        max_tick = max(max_event_tick, max_comment_tick)
+        num_segments = max_tick // self.num_ticks_per_timeline_segment + 1
         
-        logging.debug(f"Calculated max_event_time: {max_event_time}, max_comment_time: {max_comment_time}, max_time: {max_time}, num_segments: {num_segments}.")
+        logging.debug(f"Calculated max_event_tick: {max_event_tick}, max_comment_tick: {max_comment_tick}, max_tick: {max_tick}, num_segments: {num_segments}.")
+
+        events_per_segment, comments_per_segment = self.partition_by_segment(num_segments)
         
         # Generate the timeline for each segment
-        for segment_index in range(num_segments):
-            logging.debug(f"Processing segment {segment_index}.")
-            timeline_output.append("x--------------------------------------------------------------------------------------------------------------------")
-            
-            # Find all events and comments for the current segment
-            segment_events = [e for e in self.events if int(e.time // self.num_time_units_per_timeline_segment) == segment_index]
-            segment_comments = [c for c in self.comments if int(c.time // self.num_time_units_per_timeline_segment) == segment_index]
-            
-            logging.debug(f"Found {len(segment_events)} events and {len(segment_comments)} comments for segment {segment_index}.")
-            
-            # Add comments (names of events in the current segment)
-            comment_lines = self.generate_comment_lines(segment_comments)
-            timeline_output.extend(comment_lines)
-            logging.debug(f"Added {len(comment_lines)} comment lines for segment {segment_index}.")
-            
-            # Add event actions in the current segment
-            event_lines = self.generate_events_line_for_timeline_segment(segment_events)
-            timeline_output.extend(event_lines)
-            logging.debug(f"Added {len(event_lines)} event lines for segment {segment_index}.")
-            
-            # Add timeline frame (with dashes per segment)
-            timeline_line = "| timeline   | " + ("|" + "-" * (self.num_subdivisions_per_time_unit - 1)) * self.num_time_units_per_timeline_segment
-            timeline_output.append(timeline_line)
-            logging.debug(f"Added timeline frame for segment {segment_index}.")
-            
-            # Add frame markers with dashes between them
-            frame_line = f"| frame: {segment_index * self.num_time_units_per_timeline_segment:03d} | "
-            frame_line += "".join([str(i) + "-" * (self.num_subdivisions_per_time_unit - 1) for i in range(self.num_time_units_per_timeline_segment)])
-            timeline_output.append(frame_line)
-            logging.debug(f"Added frame line for segment {segment_index}.")
-            
-            # Add separator between segments
-            timeline_output.append("x--------------------------------------------------------------------------------------------------------------------")
-            logging.debug(f"Added separator for segment {segment_index}.")
+        if num_workers <= 1:
+            for segment_index in range(num_segments):
+                timeline_output.extend(self.generate_timeline_segment(segment_index, events_per_segment[segment_index], comments_per_segment[segment_index]))
+        else:
+            logging.info(f"Rendering {num_segments} segments on {num_workers} workers.")
+            executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            # only the settings are shipped to the workers, not the whole timeline
+            settings = (self.frame_unit, self.num_time_units_per_timeline_segment, self.num_subdivisions_per_time_unit)
+            # batch segments together so that the per task overhead doesn't dominate on small segments
+            chunksize = max(1, num_segments // (num_workers * 4))
+            with executor_class(max_workers=num_workers) as executor:
+                # map yields results in submission order, so segments stay in order
+                for segment_output in executor.map(render_timeline_segment, [settings] * num_segments, range(num_segments),
+                                                   events_per_segment, comments_per_segment, chunksize=chunksize):
+                    timeline_output.extend(segment_output)
         
         # Combine all lines
         result = "\n".join(timeline_output)
@@ -306,7 +338,7 @@ class Timeline:
         processed_events = []
         output = "legend\n"
         for e in self.events:
-            print("DEbOGG", e.name, e.uid, e.action, e.time)
+            logging.debug(f"Adding event {e.name} with uid {e.uid}, action {e.action} and tick {e.tick} to the legend.")
             event_type = "toggle" if "toggle" in e.action.value else "playthrough"
             event_repr = (e.uid, event_type)
             if event_repr not in processed_events:
@@ -319,13 +351,23 @@ class Timeline:
 
         return output
 
-    def generate_script_event_file_contents(self) -> str:
+    def generate_script_event_file_contents(self, num_workers: int = 1, use_processes: bool = True) -> str:
         file_contents = ""
         file_contents += self.generate_legend()
-        file_contents += self.generate_timeline()
+        file_contents += self.generate_timeline(num_workers, use_processes)
         return file_contents
 
 
+def render_timeline_segment(settings: Tuple[int, int, int], segment_index: int, segment_events: List[Event], segment_comments: List[Comment]) -> List[str]:
+    """
+    Worker entry point for the parallel renderer, this lives at module level so that it can be pickled
+    for a process pool.
+    """
+    frame_unit, num_time_units_per_timeline_segment, num_subdivisions_per_time_unit = settings
+    timeline = Timeline(frame_unit, num_time_units_per_timeline_segment, num_subdivisions_per_time_unit)
+    return timeline.generate_timeline_segment(segment_index, segment_events, segment_comments)
+
+
 if __name__ == "__main__":
         
     # Example usage:
@@ -0,0 +1,129 @@
+"""
+Validation of parsed scripted event files.
+
+The runtime keys playthroughs and toggle callbacks by event name, so same name toggles that overlap or
+playthroughs with the same name at the same time don't behave the way the layout suggests. All parsed
+events are sorted once and swept in time order, which reports every problem in a single O(n log n) pass.
+
+Usage:
+    python validation.py smoking_event.txt
+"""
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+from main import *
+
+def get_event_tick(event: Dict) -> int:
+    if event["type"] == "playthrough":
+        return event["tick"]
+    return event["start_tick"] if event["start_tick"] is not None else event["end_tick"]
+
+class ValidationIssue:
+    def __init__(self, kind: str, message: str, event: Dict):
+        self.kind = kind
+        self.message = message
+        self.tick = get_event_tick(event)
+        self.block = event["block"]
+        self.line = event["line"]
+        self.column = event["column"]
+
+    def to_dict(self) -> Dict:
+        return {"kind": self.kind, "message": self.message, "tick": self.tick, "block": self.block, "line": self.line, "column": self.column}
+
+    def __str__(self) -> str:
+        return f"block {self.block}, line {self.line}, column {self.column}: {self.message}"
+
+def describe_location(event: Dict) -> str:
+    return f"block {event['block']}, line {event['line']}, column {event['column']}"
+
+# at equal ticks toggles start before playthroughs and toggles end last, toggles are inclusive at both
+# ends at runtime so a toggle starting on the tick another one ends still overlaps it
+TOGGLE_START = 0
+PLAYTHROUGH = 1
+TOGGLE_END = 2
+
+def validate_events(events: List[Dict]) -> List[ValidationIssue]:
+    """
+    Checks events as returned by parse_event_layout (with strict set to False) and returns every issue
+    found, ordered by the tick of the event it concerns and then by its location.
+
+    The issues reported are unknown keys, unmatched, inverted or zero length toggles, overlapping
+    toggles with the same name and playthroughs with the same name at the same tick.
+    """
+    issues = []
+    sweep_points = []
+
+    for event_index, event in enumerate(events):
+        if event["name"] is None:
+            issues.append(ValidationIssue("unknown_key", f"Unknown event key '{event['key']}' in the layout", event))
+            continue
+
+        if event["type"] == "playthrough":
+            sweep_points.append((event["tick"], PLAYTHROUGH, event_index))
+        elif event["start_tick"] is None:
+            issues.append(ValidationIssue("unmatched_toggle", f"Toggle '{event['name']}' ends at tick {event['end_tick']} but is never started", event))
+        elif event["end_tick"] is None:
+            issues.append(ValidationIssue("unmatched_toggle", f"Toggle '{event['name']}' starts at tick {event['start_tick']} but is never ended", event))
+        elif event["end_tick"] < event["start_tick"]:
+            issues.append(ValidationIssue("inverted_toggle", f"Toggle '{event['name']}' ends at tick {event['end_tick']} (column {event['end_column']}) before its start at tick {event['start_tick']}", event))
+        elif event["end_tick"] == event["start_tick"]:
+            # the tags of a layout can't share a column, so this only comes from events built elsewhere
+            issues.append(ValidationIssue("empty_toggle", f"Toggle '{event['name']}' starts and ends at tick {event['start_tick']}", event))
+        else:
+            sweep_points.append((event["start_tick"], TOGGLE_START, event_index))
+            sweep_points.append((event["end_tick"], TOGGLE_END, event_index))
+
+    sweep_points.sort()
+
+    # event name to the indices of its toggles that are currently on, dicts keep insertion order
+    # so the first value is the earliest toggle still running
+    active_toggles: Dict[str, Dict[int, None]] = defaultdict(dict)
+    # event name to the first playthrough seen at the current tick
+    playthroughs_at_tick: Dict[str, int] = {}
+    current_tick = None
+
+    for tick, point_type, event_index in sweep_points:
+        event = events[event_index]
+        name = event["name"]
+
+        if tick != current_tick:
+            playthroughs_at_tick.clear()
+            current_tick = tick
+
+        if point_type == TOGGLE_START:
+            if active_toggles[name]:
+                other_event = events[next(iter(active_toggles[name]))]
+                issues.append(ValidationIssue("overlapping_toggle", f"Toggle '{name}' starting at tick {event['start_tick']} overlaps the toggle with the same name at {describe_location(other_event)} ({other_event['start_tick']}, {other_event['end_tick']})", event))
+            active_toggles[name][event_index] = None
+        elif point_type == TOGGLE_END:
+            del active_toggles[name][event_index]
+        elif name in playthroughs_at_tick:
+            other_event = events[playthroughs_at_tick[name]]
+            issues.append(ValidationIssue("duplicate_playthrough", f"Playthrough '{name}' at tick {tick} duplicates the one at {describe_location(other_event)}", event))
+        else:
+            playthroughs_at_tick[name] = event_index
+
+    # issues found before the sweep are interleaved with the ones the sweep found
+    issues.sort(key=lambda issue: (issue.tick, issue.block, issue.line, issue.column))
+    return issues
+
+def validate_scripted_event_file(scripted_event_file_path: str) -> List[ValidationIssue]:
+    with open(scripted_event_file_path, 'r') as file:
+        legend = parse_legend_to_dictionary(extract_legend(file.read()))
+    parsed_events = parse_event_layout(scripted_event_file_path, legend, strict=False)
+    return validate_events(parsed_events["events"])
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python validation.py <scripted event file>")
+        sys.exit(2)
+
+    # the converter logs at debug level by default, only the issues should be printed here
+    logging.getLogger().setLevel(logging.WARNING)
+
+    issues = validate_scripted_event_file(sys.argv[1])
+    for issue in issues:
+        print(issue)
+    print(f"{len(issues)} issues found.")
+    sys.exit(1 if issues else 0)